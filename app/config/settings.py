@@ -2,3 +2,6 @@ import os
 
 CHUQIN_DIR = os.getenv("CHUQIN_DIR", os.path.expanduser("~"))
 CHUQIN_CONFIG_DIR = os.path.join(CHUQIN_DIR, ".chuqin")
+
+# Print startup timings to the console, set CHUQIN_STARTUP_TIMING=1 to enable
+CHUQIN_STARTUP_TIMING = os.getenv("CHUQIN_STARTUP_TIMING") == "1"
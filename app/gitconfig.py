@@ -0,0 +1,238 @@
+import os
+import re
+from pathlib import Path
+
+DISABLED_SECTION_RE = re.compile(r'#\s*\[')
+DISABLED_CONFIG_RE = re.compile(r'#\s*\S+\s*=')
+SECTION_HEADER_RE = re.compile(r'\[([^\]]+)\]')
+KEY_VALUE_RE = re.compile(r'(\S+)\s*=\s*(.*)$')
+
+# Config scopes the tool can edit, see get_gitconfig_path
+GITCONFIG_SCOPES = ("global", "xdg")
+
+
+def parse_gitconfig(content):
+    """
+    Parse .gitconfig content into a list of entries, one per line.
+    """
+    entries = []
+    lines = content.split('\n')
+    current_section = None
+    current_subsection = None
+
+    for i, line in enumerate(lines):
+        stripped = line.strip()
+
+        # Skip empty lines
+        if not stripped:
+            entries.append({
+                "type": "empty",
+                "line_number": i + 1,
+                "raw": line
+            })
+            continue
+
+        # Check if line is commented (disabled) - but preserve original for pure comments
+        is_disabled = stripped.startswith('#')
+
+        # Pure comment line (starts with # and is not a disabled config)
+        if is_disabled and not DISABLED_SECTION_RE.match(stripped) and not DISABLED_CONFIG_RE.match(stripped):
+            entries.append({
+                "type": "comment",
+                "line_number": i + 1,
+                "raw": line
+            })
+            continue
+
+        # Remove # prefix for disabled configs
+        if is_disabled:
+            stripped = stripped[1:].strip()
+
+        # Section header: [section "subsection"] or [section]
+        section_match = SECTION_HEADER_RE.match(stripped)
+        if section_match:
+            current_section, current_subsection = parse_section_header(section_match.group(1))
+
+            entries.append({
+                "type": "section",
+                "line_number": i + 1,
+                "section": current_section,
+                "subsection": current_subsection,
+                "disabled": is_disabled,
+                "raw": line
+            })
+            continue
+
+        # Key-value pair: key = value
+        kv_match = KEY_VALUE_RE.match(stripped)
+        if kv_match:
+            key = kv_match.group(1).strip()
+            value = kv_match.group(2).strip()
+
+            entries.append({
+                "type": "config",
+                "line_number": i + 1,
+                "section": current_section,
+                "subsection": current_subsection,
+                "key": key,
+                "value": value,
+                "disabled": is_disabled,
+                "raw": line
+            })
+            continue
+
+        # Unknown line type - preserve as-is
+        entries.append({
+            "type": "unknown",
+            "line_number": i + 1,
+            "raw": line
+        })
+
+    return entries
+
+
+def parse_section_header(section_str):
+    """
+    Split the text between the brackets of a header into (section, subsection).
+    """
+    parts = section_str.split('"', 1)
+    if len(parts) == 2:
+        return parts[0].strip(), parts[1].rstrip('"').strip()
+    return section_str.strip(), None
+
+
+def section_id(section, subsection):
+    """
+    Identity of a logical section: section names are case-insensitive, subsections are not.
+    """
+    if section is None:
+        return None
+    return (section.lower(), subsection or None)
+
+
+def split_sections(entries):
+    """
+    Split entries into blocks, one per active section header.
+    Returns (start, end, section_id) tuples covering all entries in order. The first
+    block holds the lines before any header and has section_id None, it may be empty.
+    Git ignores disabled headers, so they stay inside the block that was open before.
+    """
+    blocks = []
+    start = 0
+    sid = None
+    for position, entry in enumerate(entries):
+        if entry.get("type") == "section" and not entry.get("disabled", False):
+            blocks.append((start, position, sid))
+            start = position
+            sid = section_id(entry.get("section"), entry.get("subsection"))
+    blocks.append((start, len(entries), sid))
+    return blocks
+
+
+def get_gitconfig_path(scope="global"):
+    """
+    Get the path to the user's config file of a scope.
+    "global" is ~/.gitconfig, "xdg" is $XDG_CONFIG_HOME/git/config, which defaults
+    to ~/.config/git/config. Git reads both, the global file takes precedence.
+    """
+    home = Path.home()
+    if scope == "global":
+        return str(home / ".gitconfig")
+    if scope == "xdg":
+        config_home = os.environ.get("XDG_CONFIG_HOME") or str(home / ".config")
+        return str(Path(config_home) / "git" / "config")
+    raise ValueError(f"Unknown config scope: {scope}")
+
+
+def read_gitconfig(gitconfig_path=None):
+    """
+    Read and parse the .gitconfig file.
+    Returns a list of config entries with their structure.
+    """
+    gitconfig_path = gitconfig_path or get_gitconfig_path()
+    
+    if not os.path.exists(gitconfig_path):
+        return {
+            "success": True,
+            "entries": [],
+            "raw_content": ""
+        }
+    
+    try:
+        with open(gitconfig_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        
+        entries = parse_gitconfig(content)
+        
+        return {
+            "success": True,
+            "entries": entries,
+            "raw_content": content
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "entries": [],
+            "raw_content": ""
+        }
+
+
+def write_gitconfig(entries, gitconfig_path=None):
+    """
+    Write config entries back to .gitconfig file.
+    entries: List of entry objects with structure from read_gitconfig
+    """
+    gitconfig_path = gitconfig_path or get_gitconfig_path()
+    
+    try:
+        lines = []
+        for entry in entries:
+            if entry.get("type") == "empty":
+                lines.append("")
+            elif entry.get("type") == "section":
+                section = entry.get("section", "")
+                subsection = entry.get("subsection")
+                disabled = entry.get("disabled", False)
+                
+                if subsection:
+                    section_str = f'[{section} "{subsection}"]'
+                else:
+                    section_str = f'[{section}]'
+                
+                if disabled:
+                    lines.append(f"# {section_str}")
+                else:
+                    lines.append(section_str)
+            elif entry.get("type") == "config":
+                key = entry.get("key", "")
+                value = entry.get("value", "")
+                disabled = entry.get("disabled", False)
+                
+                # Add space indentation before config key-value pairs (4 spaces)
+                indent = "    "  # 4 spaces
+                if disabled:
+                    # For disabled configs, add spaces before the comment
+                    config_line = f"{indent}# {key} = {value}"
+                else:
+                    config_line = f"{indent}{key} = {value}"
+                lines.append(config_line)
+            elif entry.get("type") == "comment":
+                lines.append(entry.get("raw", ""))
+            elif entry.get("type") == "unknown":
+                lines.append(entry.get("raw", ""))
+            else:
+                # Fallback: use raw content
+                lines.append(entry.get("raw", ""))
+        
+        content = '\n'.join(lines)
+        
+        # Ensure directory exists
+        os.makedirs(os.path.dirname(gitconfig_path), exist_ok=True)
+        
+        with open(gitconfig_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        
+        return {"success": True}
+    except Exception as e:
+        return {"success": False, "error": str(e)}
@@ -0,0 +1,414 @@
+import hashlib
+from bisect import bisect_left
+
+from app.gitconfig import SECTION_HEADER_RE, parse_gitconfig, parse_section_header, section_id, split_sections
+
+CONFLICT_OURS_MARKER = "<<<<<<< ours"
+CONFLICT_SEPARATOR = "======="
+CONFLICT_THEIRS_MARKER = ">>>>>>> theirs"
+
+INDENT = "    "
+
+
+class _Section:
+    """
+    Lines of one logical section, which may be spread over repeated headers.
+    The digest covers the raw lines, so identical sections are detected without
+    parsing them. Lines read from a file are only parsed into entries, and their
+    keys indexed, for sections that differ.
+    """
+    def __init__(self, section, subsection):
+        self.section = section
+        self.subsection = subsection
+        # Raw lines without the headers, and (index in lines, line number) per block
+        self.lines = []
+        self._blocks = []
+        self._entries = None
+        self._digest = None
+        self._order = None
+        self._values = None
+
+    def add_lines(self, lines, line_number):
+        self._blocks.append((len(self.lines), line_number))
+        self.lines.extend(lines)
+
+    def digest(self):
+        """Hash of the raw section lines, equal digests mean identical sections."""
+        if self._digest is None:
+            text = "\n".join(self.lines)
+            self._digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+        return self._digest
+
+    @property
+    def entries(self):
+        if self._entries is None:
+            entries = parse_gitconfig("\n".join(self.lines)) if self.lines else []
+            bounds = self._blocks + [(len(self.lines), None)]
+            for (start, line_number), (end, _) in zip(bounds, bounds[1:]):
+                for offset, entry in enumerate(entries[start:end]):
+                    entry["line_number"] = line_number + offset
+            self._entries = entries
+        return self._entries
+
+    @property
+    def order(self):
+        if self._order is None:
+            self._build_index()
+        return self._order
+
+    @property
+    def values(self):
+        if self._values is None:
+            self._build_index()
+        return self._values
+
+    def _build_index(self):
+        """
+        Index active (not disabled) keys by (lowercased name, occurrence), so repeated
+        keys such as remote.*.fetch are matched by position among their namesakes.
+        """
+        order = []
+        values = {}
+        occurrences = {}
+        for entry in self.entries:
+            if entry.get("type") != "config" or entry.get("disabled", False):
+                continue
+            key = entry.get("key", "")
+            name = key.lower()
+            occurrence = occurrences.get(name, 0)
+            occurrences[name] = occurrence + 1
+            ident = (name, occurrence)
+            order.append(ident)
+            values[ident] = (key, entry.get("value", ""), entry.get("line_number"))
+        self._order = order
+        self._values = values
+
+
+def build_entry_map(entries):
+    """
+    Group parsed entries into a map of section id to _Section, in file order.
+    Lines under a disabled header still belong to the previous section, as git reads them.
+    Lines before the first header are kept under None, unless there are none.
+    """
+    sections = {}
+    for start, end, sid in split_sections(entries):
+        if sid is None:
+            section = sections[None] = _Section(None, None)
+            section._entries = []
+            block = entries[start:end]
+        else:
+            section = sections.get(sid)
+            if section is None:
+                header = entries[start]
+                section = sections[sid] = _Section(header.get("section"), header.get("subsection"))
+                section._entries = []
+            # Skip the header line itself
+            block = entries[start + 1:end]
+        section.add_lines([entry.get("raw", "") for entry in block], None)
+        section._entries.extend(block)
+    if not sections[None].lines:
+        del sections[None]
+    return sections
+
+
+def build_text_map(content):
+    """
+    Same as build_entry_map for file content, without parsing every line.
+    Only header lines are recognized here, the same way parse_gitconfig does.
+    """
+    lines = content.split("\n")
+    sections = {None: _Section(None, None)}
+    current = sections[None]
+    start = 0
+    for number, line in enumerate(lines):
+        stripped = line.lstrip()
+        if stripped[:1] != "[":
+            continue
+        match = SECTION_HEADER_RE.match(stripped)
+        if match is None:
+            continue
+        current.add_lines(lines[start:number], start + 1)
+        name, subsection = parse_section_header(match.group(1))
+        sid = section_id(name, subsection)
+        current = sections.get(sid)
+        if current is None:
+            current = sections[sid] = _Section(name, subsection)
+        start = number + 1
+    current.add_lines(lines[start:], start + 1)
+    if not sections[None].lines:
+        del sections[None]
+    return sections
+
+
+def _section_map(config):
+    return build_text_map(config) if isinstance(config, str) else build_entry_map(config)
+
+
+def _reordered(left, right):
+    """
+    Keys present in both sections whose relative order changed.
+    Keys on the longest increasing run of right-hand positions keep their order,
+    the others are reported as moved.
+    """
+    right_index = {ident: i for i, ident in enumerate(right.order)}
+    common = [ident for ident in left.order if ident in right_index]
+    positions = [right_index[ident] for ident in common]
+
+    # Longest increasing subsequence with predecessor links
+    tails = []
+    tail_indexes = []
+    previous = [-1] * len(positions)
+    for i, position in enumerate(positions):
+        j = bisect_left(tails, position)
+        if j == len(tails):
+            tails.append(position)
+            tail_indexes.append(i)
+        else:
+            tails[j] = position
+            tail_indexes[j] = i
+        previous[i] = tail_indexes[j - 1] if j > 0 else -1
+
+    stable = set()
+    i = tail_indexes[-1] if tail_indexes else -1
+    while i != -1:
+        stable.add(common[i])
+        i = previous[i]
+    return [ident for ident in common if ident not in stable]
+
+
+def _change(status, ident, left, right):
+    left_item = left.values.get(ident) if left is not None else None
+    right_item = right.values.get(ident) if right is not None else None
+    item = left_item or right_item
+    return {
+        "key": item[0],
+        "status": status,
+        "left": left_item[1] if left_item else None,
+        "right": right_item[1] if right_item else None,
+        "left_line": left_item[2] if left_item else None,
+        "right_line": right_item[2] if right_item else None,
+    }
+
+
+def _diff_section(left, right):
+    changes = []
+    for ident in left.order:
+        if ident not in right.values:
+            changes.append(_change("removed", ident, left, right))
+        elif left.values[ident][1] != right.values[ident][1]:
+            changes.append(_change("changed", ident, left, right))
+    for ident in right.order:
+        if ident not in left.values:
+            changes.append(_change("added", ident, left, right))
+    for ident in _reordered(left, right):
+        changes.append(_change("reordered", ident, left, right))
+    return changes
+
+
+def diff_gitconfig(left, right):
+    """
+    Structural diff of two configs, each given as file content or parsed entries.
+    Sections with equal content hashes are skipped without parsing or comparing their keys.
+    """
+    left_map = _section_map(left)
+    right_map = _section_map(right)
+
+    sections = []
+    identical = 0
+    for sid, left in left_map.items():
+        right = right_map.get(sid)
+        if right is None:
+            changes = [_change("removed", ident, left, None) for ident in left.order]
+            # Comments before the first header are not a section of their own
+            if changes or sid is not None:
+                sections.append(_section_diff(left, "removed", changes))
+        elif left.digest() == right.digest():
+            identical += 1
+        else:
+            changes = _diff_section(left, right)
+            if changes:
+                sections.append(_section_diff(left, "changed", changes))
+            else:
+                # Only formatting or comments differ
+                identical += 1
+    for sid, right in right_map.items():
+        if sid not in left_map:
+            changes = [_change("added", ident, None, right) for ident in right.order]
+            if changes or sid is not None:
+                sections.append(_section_diff(right, "added", changes))
+
+    summary = {"identical_sections": identical}
+    for status in ("added", "removed", "changed", "reordered"):
+        summary[status] = sum(
+            1 for section in sections for change in section["changes"] if change["status"] == status
+        )
+    return {"sections": sections, "summary": summary}
+
+
+def _section_diff(section, status, changes):
+    return {
+        "section": section.section,
+        "subsection": section.subsection,
+        "status": status,
+        "changes": changes,
+    }
+
+
+def _section_header(section):
+    if section.subsection:
+        return f'[{section.section} "{section.subsection}"]'
+    return f'[{section.section}]'
+
+
+def _key_line(item):
+    return f"{INDENT}{item[0]} = {item[1]}"
+
+
+def _merge_key(ident, base_values, our_values, their_values):
+    """
+    Resolve one key. Returns ("keep", item) for the chosen side's item, None if the
+    key is dropped, or ("conflict", our_item, their_item).
+    """
+    base_item = base_values.get(ident)
+    our_item = our_values.get(ident)
+    their_item = their_values.get(ident)
+    base_value = base_item[1] if base_item else None
+    our_value = our_item[1] if our_item else None
+    their_value = their_item[1] if their_item else None
+
+    if our_value == their_value or their_value == base_value:
+        chosen = our_item
+    elif our_value == base_value:
+        chosen = their_item
+    else:
+        return "conflict", our_item, their_item
+    return ("keep", chosen) if chosen is not None else None
+
+
+def _merge_section(base, ours, theirs, lines, conflicts):
+    """
+    Merge one section, appending the output lines.
+    Our lines are kept in order, including comments and disabled keys, and every
+    active key is replaced by its merged value. Keys only added by theirs follow
+    our last key. Without our side, their lines are walked instead.
+    """
+    empty = {}
+    base_values = base.values if base is not None else empty
+    our_values = ours.values if ours is not None else empty
+    their_values = theirs.values if theirs is not None else empty
+    walked = ours if ours is not None else theirs
+
+    output = []
+
+    def emit(ident, line):
+        resolution = _merge_key(ident, base_values, our_values, their_values)
+        if resolution is None:
+            return
+        if resolution[0] == "keep":
+            item = resolution[1]
+            # Keep the original line when it already holds the chosen value
+            output.append(line if line is not None and item is walked.values.get(ident) else _key_line(item))
+            return
+        _, our_item, their_item = resolution
+        conflicts.append({
+            "section": walked.section,
+            "subsection": walked.subsection,
+            "key": (our_item or their_item)[0],
+            "base": base_values[ident][1] if ident in base_values else None,
+            "ours": our_item[1] if our_item else None,
+            "theirs": their_item[1] if their_item else None,
+            "line": len(lines) + len(output) + 1,
+        })
+        output.append(CONFLICT_OURS_MARKER)
+        if our_item:
+            output.append(_key_line(our_item))
+        output.append(CONFLICT_SEPARATOR)
+        if their_item:
+            output.append(_key_line(their_item))
+        output.append(CONFLICT_THEIRS_MARKER)
+
+    occurrences = {}
+    insert_at = None
+    for entry in walked.entries:
+        if entry.get("type") != "config":
+            output.append(entry.get("raw", ""))
+            continue
+        if entry.get("disabled", False):
+            output.append(entry.get("raw", ""))
+        else:
+            # Same identity as _Section._build_index
+            name = entry.get("key", "").lower()
+            occurrence = occurrences.get(name, 0)
+            occurrences[name] = occurrence + 1
+            emit((name, occurrence), entry.get("raw", ""))
+        insert_at = len(output)
+
+    if walked is ours and theirs is not None:
+        # Keys added by theirs go after our last key, or before trailing blank lines
+        if insert_at is None:
+            insert_at = len(output)
+            while insert_at and not output[insert_at - 1].strip():
+                insert_at -= 1
+        tail = output[insert_at:]
+        del output[insert_at:]
+        for ident in theirs.order:
+            if ident not in our_values:
+                emit(ident, None)
+        output.extend(tail)
+
+    lines.extend(output)
+
+
+def merge_gitconfig(base, ours, theirs):
+    """
+    Three-way merge of configs, each given as file content or parsed entries.
+    A key changed on one side only takes that side's value, keys changed
+    differently on both sides are written between conflict markers.
+    Sections identical on two sides are resolved by hash and copied verbatim,
+    merged sections keep our comments and disabled keys.
+    """
+    base_map = _section_map(base)
+    our_map = _section_map(ours)
+    their_map = _section_map(theirs)
+
+    order = list(our_map)
+    order.extend(sid for sid in their_map if sid not in our_map)
+    # Lines before the first header stay in front
+    order.sort(key=lambda sid: sid is not None)
+
+    lines = []
+    conflicts = []
+    for sid in order:
+        base = base_map.get(sid)
+        ours = our_map.get(sid)
+        theirs = their_map.get(sid)
+
+        if ours is not None and theirs is not None and ours.digest() == theirs.digest():
+            resolved = ours
+        elif base is not None and ours is not None and theirs is not None and base.digest() == theirs.digest():
+            resolved = ours
+        elif base is not None and ours is not None and theirs is not None and base.digest() == ours.digest():
+            resolved = theirs
+        elif ours is None and base is not None and theirs is not None and base.digest() == theirs.digest():
+            # Section removed by us and untouched by them
+            continue
+        elif theirs is None and base is not None and ours is not None and base.digest() == ours.digest():
+            # Section removed by them and untouched by us
+            continue
+        else:
+            resolved = None
+
+        section = ours or theirs
+        if sid is not None:
+            lines.append(_section_header(section))
+        if resolved is not None:
+            # Untouched sections keep their original lines, including comments
+            lines.extend(resolved.lines)
+        else:
+            _merge_section(base, ours, theirs, lines, conflicts)
+
+    # A parsed file that ends with a newline ends with an empty entry, only add the
+    # newline if it is missing, so merging and saving does not grow the file
+    if lines and lines[-1] != "":
+        lines.append("")
+    return {"content": "\n".join(lines), "conflicts": conflicts}
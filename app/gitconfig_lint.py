@@ -0,0 +1,425 @@
+import re
+import threading
+from bisect import bisect_right
+
+from app.gitconfig import section_id, split_sections
+
+SEVERITY_ERROR = "error"
+SEVERITY_WARNING = "warning"
+
+KEY_RE = re.compile(r'^[A-Za-z][A-Za-z0-9-]*$')
+SECTION_RE = re.compile(r'^[A-Za-z0-9.-]+$')
+
+KNOWN_SECTIONS = {
+    "add", "advice", "alias", "am", "apply", "attr", "author", "bitmappseudomerge", "blame", "branch",
+    "browser", "bundle", "checkout", "clean", "clone", "color", "column", "commit", "commitgraph",
+    "committer", "completion", "core", "credential", "credentialcache", "diff", "difftool", "extensions",
+    "fastimport", "feature", "fetch", "filter", "format", "fsck", "fsmonitor", "gc", "gitcvs", "gitweb",
+    "gpg", "grep", "gui", "guitool", "help", "hook", "http", "i18n", "imap", "include", "includeif",
+    "index", "init", "instaweb", "interactive", "lfs", "log", "lsrefs", "mailinfo", "mailmap",
+    "maintenance", "man", "merge", "mergetool", "notes", "pack", "pager", "pretty", "promisor",
+    "protocol", "pull", "push", "rebase", "receive", "remote", "remotes", "repack", "rerere", "revert",
+    "safe", "scalar", "sendemail", "sendpack", "sequence", "showbranch", "sparse", "splitindex", "ssh",
+    "stash", "status", "submodule", "svn", "tag", "tar", "trace2", "trailer", "transfer",
+    "uploadarchive", "uploadpack", "url", "user", "versionsort", "web", "worktree",
+}
+
+# Keys that git accepts multiple times, each occurrence adds a value instead of replacing it
+MULTI_VALUED_KEYS = {
+    ("blame", "ignorerevsfile"),
+    ("branch", "merge"),
+    ("credential", "helper"),
+    ("http", "extraheader"),
+    ("include", "path"),
+    ("includeif", "path"),
+    ("log", "excludedecoration"),
+    ("maintenance", "repo"),
+    ("notes", "displayref"),
+    ("notes", "rewriteref"),
+    ("push", "pushoption"),
+    ("receive", "hiderefs"),
+    ("remote", "fetch"),
+    ("remote", "push"),
+    ("remote", "pushurl"),
+    ("remote", "url"),
+    ("safe", "directory"),
+    ("sendemail", "bcc"),
+    ("sendemail", "cc"),
+    ("sendemail", "to"),
+    ("transfer", "hiderefs"),
+    ("uploadpack", "hiderefs"),
+    ("url", "insteadof"),
+    ("url", "pushinsteadof"),
+    ("versionsort", "suffix"),
+}
+
+BOOLEAN_KEYS = {
+    ("advice", None),
+    ("commit", "gpgsign"),
+    ("core", "bare"),
+    ("core", "filemode"),
+    ("core", "ignorecase"),
+    ("core", "precomposeunicode"),
+    ("core", "quotepath"),
+    ("core", "sparsecheckout"),
+    ("core", "symlinks"),
+    ("core", "trustctime"),
+    ("fetch", "prune"),
+    ("fetch", "prunetags"),
+    ("http", "sslverify"),
+    ("push", "autosetupremote"),
+    ("push", "followtags"),
+    ("rebase", "autosquash"),
+    ("rebase", "autostash"),
+    ("rebase", "updaterefs"),
+    ("rerere", "enabled"),
+    ("tag", "gpgsign"),
+}
+
+BOOLEAN_VALUES = {"true", "false", "yes", "no", "on", "off", "1", "0", ""}
+
+
+class _SectionGroup:
+    """
+    All entries of one logical section, which may be spread over repeated headers.
+    Rules report positions local to this group's entries.
+    """
+    def __init__(self, section, subsection, entries):
+        self.section = section
+        self.subsection = subsection
+        self.entries = entries
+
+
+def _active(group, entry_type):
+    for local, entry in enumerate(group.entries):
+        if entry.get("type") == entry_type and not entry.get("disabled", False):
+            yield local, entry
+
+
+def _strip_value(value):
+    value = re.split(r'\s[#;]', value, maxsplit=1)[0].strip()
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        value = value[1:-1]
+    return value
+
+
+def check_unparseable(group):
+    """Lines that are neither sections, key-value pairs nor comments."""
+    for local, entry in enumerate(group.entries):
+        if entry.get("type") != "unknown":
+            continue
+        stripped = entry.get("raw", "").strip()
+        # A bare key inside a section is valid git syntax and means "true"
+        if group.section is not None and KEY_RE.match(stripped):
+            continue
+        yield local, SEVERITY_ERROR, "unparseable-line", "Line cannot be parsed as a section or key", None
+
+
+def check_section_name(group):
+    """Section names may only contain alphanumerics, '-' and '.'."""
+    if group.section is None:
+        for local, _ in _active(group, "config"):
+            yield local, SEVERITY_ERROR, "key-outside-section", "Key is not inside any section", None
+        return
+    for local, entry in _active(group, "section"):
+        if not SECTION_RE.match(entry.get("section") or ""):
+            yield local, SEVERITY_ERROR, "invalid-section", f"Invalid section name: {entry.get('section')}", None
+
+
+def check_unknown_section(group):
+    """Sections that git itself does not read."""
+    if group.section is None or group.section.lower() in KNOWN_SECTIONS:
+        return
+    for local, _ in _active(group, "section"):
+        yield local, SEVERITY_WARNING, "unknown-section", f"Unknown section: {group.section}", None
+        return
+
+
+def check_key_syntax(group):
+    """Keys must start with a letter and contain only alphanumerics and '-'."""
+    for local, entry in _active(group, "config"):
+        if not KEY_RE.match(entry.get("key") or ""):
+            yield local, SEVERITY_ERROR, "invalid-key", f"Invalid key name: {entry.get('key')}", None
+
+
+def check_duplicate_keys(group):
+    """Repeated single-valued keys, where only the last occurrence takes effect."""
+    if group.section is None:
+        return
+    section = group.section.lower()
+    seen = {}
+    for local, entry in _active(group, "config"):
+        key = (entry.get("key") or "").lower()
+        if (section, key) in MULTI_VALUED_KEYS:
+            continue
+        if key in seen:
+            earlier, earlier_value = seen[key]
+            if earlier_value == entry.get("value"):
+                yield local, SEVERITY_WARNING, "duplicate-key", f"Duplicate key: {entry.get('key')}", earlier
+            else:
+                yield earlier, SEVERITY_WARNING, "shadowed-key", \
+                    f"Value of {entry.get('key')} is overridden by a later entry", local
+        seen[key] = (local, entry.get("value"))
+
+
+def check_boolean_values(group):
+    """Known boolean keys must hold a value git can parse as a boolean."""
+    if group.section is None:
+        return
+    section = group.section.lower()
+    for local, entry in _active(group, "config"):
+        key = (entry.get("key") or "").lower()
+        if (section, key) not in BOOLEAN_KEYS and (section, None) not in BOOLEAN_KEYS:
+            continue
+        if _strip_value(entry.get("value") or "").lower() not in BOOLEAN_VALUES:
+            yield local, SEVERITY_ERROR, "bad-boolean", \
+                f"{entry.get('key')} expects a boolean, got: {entry.get('value')}", None
+
+
+RULES = [
+    check_unparseable,
+    check_section_name,
+    check_unknown_section,
+    check_key_syntax,
+    check_duplicate_keys,
+    check_boolean_values,
+]
+
+
+def _run_rules(group):
+    results = []
+    for rule in RULES:
+        results.extend(rule(group))
+    return results
+
+
+class GitConfigLinter:
+    """
+    Rule-based linter over entries from read_gitconfig.
+    The entries are kept between calls and edits are applied with splice, so after
+    an edit only the sections it touched are checked again. Other sections keep
+    their results, which are stored relative to the section and only shift.
+    """
+    def __init__(self):
+        self._entries = None
+        # Block start positions and section numbers, from split_sections
+        self._starts = []
+        self._block_ids = []
+        # Section ids are numbered, so finding the blocks of a section compares ints
+        self._numbers = {}
+        self._sids = []
+        # Results of sections with findings by number, and the totals over all of them
+        self._results = {}
+        self._errors = 0
+        self._warnings = 0
+        self._lock = threading.Lock()
+
+    def lint(self, entries):
+        """
+        Check all entries and keep them for later splice calls.
+        Returns diagnostics sorted by line number. Line numbers are entry index + 1,
+        matching the file write_gitconfig produces.
+        """
+        with self._lock:
+            self._entries = list(entries)
+            blocks = split_sections(self._entries)
+            self._numbers = {}
+            self._sids = []
+            self._starts = [start for start, _, _ in blocks]
+            self._block_ids = [self._number(sid) for _, _, sid in blocks]
+            self._results = {}
+            self._errors = self._warnings = 0
+            diagnostics = []
+            for number, indexes in _group_blocks(self._block_ids).items():
+                self._store(number, indexes)
+                diagnostics.extend(self._diagnostics(number, indexes))
+            diagnostics.sort(key=lambda d: d["line_number"])
+            return diagnostics
+
+    def splice(self, start, delete_count, items):
+        """
+        Apply an editor change made as entries.splice(start, delete_count, ...items)
+        and revalidate the sections it touched.
+        Only the diagnostics of those sections are returned, under "sections". The
+        diagnostics of other sections are unchanged, apart from lines after the
+        edit moving by len(items) - delete_count.
+        """
+        with self._lock:
+            if self._entries is None:
+                raise ValueError("No entries to revalidate, validate the whole config first")
+            if start < 0 or delete_count < 0 or start + delete_count > len(self._entries):
+                raise ValueError(f"Edit out of range: {start}, {delete_count}")
+
+            # Blocks around the edit, including the one before it, since removing a
+            # header merges its lines into the previous section. The header ending the
+            # region lies after the edit, so blocks outside the region only shift.
+            first = self._block_index(start - 1)
+            last = self._block_index(min(start + delete_count, len(self._entries) - 1))
+            region_start = self._starts[first]
+            region_end = self._block_end(last)
+
+            self._entries[start:start + delete_count] = items
+            delta = len(items) - delete_count
+
+            old_ids = self._block_ids[first:last + 1]
+            new_starts, new_ids = self._scan(first, region_start, region_end + delta)
+            self._starts[first:] = new_starts + [position + delta for position in self._starts[last + 1:]]
+            self._block_ids[first:last + 1] = new_ids
+
+            touched = set(old_ids) | set(new_ids)
+            diagnostics = []
+            for number in touched:
+                indexes = self._blocks_of(number)
+                self._store(number, indexes)
+                diagnostics.extend(self._diagnostics(number, indexes))
+            diagnostics.sort(key=lambda d: d["line_number"])
+            return {
+                "sections": sorted(_section_key(self._sids[number]) for number in touched),
+                "diagnostics": diagnostics,
+                "errors": self._errors,
+                "warnings": self._warnings,
+            }
+
+    def _scan(self, first, region_start, region_end):
+        """Blocks of entries[region_start:region_end], the region starts with block first."""
+        starts = [region_start]
+        ids = [self._block_ids[first]]
+        # Only the lines before the first header can have a header at the region start
+        position = region_start if first == 0 else region_start + 1
+        for entry in self._entries[position:region_end]:
+            if _is_header(entry):
+                starts.append(position)
+                ids.append(self._number(section_id(entry.get("section"), entry.get("subsection"))))
+            position += 1
+        return starts, ids
+
+    def _number(self, sid):
+        number = self._numbers.get(sid)
+        if number is None:
+            number = self._numbers[sid] = len(self._sids)
+            self._sids.append(sid)
+        return number
+
+    def _blocks_of(self, number):
+        """Indexes of the blocks of a section, none once it was removed."""
+        indexes = []
+        try:
+            index = self._block_ids.index(number)
+            while True:
+                indexes.append(index)
+                index = self._block_ids.index(number, index + 1)
+        except ValueError:
+            return indexes
+
+    def _block_index(self, position):
+        return max(bisect_right(self._starts, position) - 1, 0)
+
+    def _block_end(self, index):
+        return self._starts[index + 1] if index + 1 < len(self._starts) else len(self._entries)
+
+    def _store(self, number, indexes):
+        """Recheck the section made of blocks indexes, only sections with findings are kept."""
+        for _, severity, _, _, _ in self._results.pop(number, ()):
+            self._count(severity, -1)
+        results = self._check(number, indexes) if indexes else None
+        if results:
+            self._results[number] = results
+            for _, severity, _, _, _ in results:
+                self._count(severity, 1)
+
+    def _count(self, severity, step):
+        if severity == SEVERITY_ERROR:
+            self._errors += step
+        else:
+            self._warnings += step
+
+    def _check(self, number, indexes):
+        entries = []
+        for index in indexes:
+            entries.extend(self._entries[self._starts[index]:self._block_end(index)])
+        if self._sids[number] is None:
+            group = _SectionGroup(None, None, entries)
+        else:
+            header = self._entries[self._starts[indexes[0]]]
+            group = _SectionGroup(header.get("section"), header.get("subsection"), entries)
+        return _run_rules(group)
+
+    def _diagnostics(self, number, indexes):
+        """Diagnostics of one section, with positions local to it mapped back to lines."""
+        results = self._results.get(number)
+        if not results:
+            return []
+        offsets = []
+        block_starts = []
+        size = 0
+        for index in indexes:
+            offsets.append(size)
+            block_starts.append(self._starts[index])
+            size += self._block_end(index) - self._starts[index]
+
+        def line_number(local):
+            block = bisect_right(offsets, local) - 1
+            return block_starts[block] + local - offsets[block] + 1
+
+        key = _section_key(self._sids[number])
+        return [{
+            "line_number": line_number(local),
+            "severity": severity,
+            "rule": rule,
+            "message": message,
+            "related_line_number": line_number(related) if related is not None else None,
+            "section": key,
+        } for local, severity, rule, message, related in results]
+
+
+def _section_key(sid):
+    """
+    Section id as a string for the editor: the header without brackets, "" before any header.
+    """
+    if sid is None:
+        return ""
+    name, subsection = sid
+    return name if subsection is None else f'{name} "{subsection}"'
+
+
+def _group_blocks(block_ids):
+    groups = {}
+    for index, sid in enumerate(block_ids):
+        groups.setdefault(sid, []).append(index)
+    return groups
+
+
+def _is_header(entry):
+    return entry.get("type") == "section" and not entry.get("disabled", False)
+
+
+def _result(diagnostics):
+    return {
+        "success": True,
+        "diagnostics": diagnostics,
+        "errors": sum(1 for d in diagnostics if d["severity"] == SEVERITY_ERROR),
+        "warnings": sum(1 for d in diagnostics if d["severity"] == SEVERITY_WARNING),
+    }
+
+
+def validate_gitconfig(entries, linter=None):
+    """
+    Validate config entries and report errors and warnings with line numbers.
+    With a linter the entries are kept for later revalidate_gitconfig calls.
+    """
+    try:
+        return _result((linter or GitConfigLinter()).lint(entries))
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+def revalidate_gitconfig(linter, start, delete_count, entries):
+    """
+    Apply an edit to the entries kept by linter, as Array.prototype.splice does,
+    and only revalidate the sections it touched.
+    Returns the diagnostics of those sections and the totals of the whole config.
+    """
+    try:
+        return dict(linter.splice(start, delete_count, entries), success=True)
+    except Exception as e:
+        return {"success": False, "error": str(e)}
@@ -1,12 +1,52 @@
-import os
-import re
-import subprocess
-import sys
 import time
-import urllib.request
-from pathlib import Path
 
-import webview
+# Reference point for the startup timings, taken first so imports are included
+STARTUP_TIME = time.perf_counter()
+
+import multiprocessing  # noqa: E402
+import subprocess  # noqa: E402
+import sys  # noqa: E402
+import threading  # noqa: E402
+import urllib.request  # noqa: E402
+from html import escape  # noqa: E402
+from pathlib import Path  # noqa: E402
+
+import webview  # noqa: E402
+
+if not __package__:
+    # Started as a script (python app/main.py), make the app package importable
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.config.settings import CHUQIN_STARTUP_TIMING  # noqa: E402
+from app.gitconfig import GITCONFIG_SCOPES, get_gitconfig_path, parse_gitconfig  # noqa: E402
+from app.gitconfig_lint import GitConfigLinter, revalidate_gitconfig, validate_gitconfig  # noqa: E402
+from app.service import BackendService  # noqa: E402
+from app.urllog import analyze_url_log, get_url_log_stats, read_url_log_page  # noqa: E402
+
+# Startup stages already reported, later windows reaching a stage are not timed again
+_reported_stages = set()
+_reported_stages_lock = threading.Lock()
+
+# Resolved portal URL, used to open additional windows once the first one has loaded
+_portal_url = None
+
+# Shown by the shell window while the portal URL is resolved and loaded
+SPLASH_HTML = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="UTF-8" />
+<style>
+  html, body { height: 100%; margin: 0; }
+  body {
+    display: flex; align-items: center; justify-content: center;
+    background: linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%);
+    font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
+    color: #2c3e50; font-size: 36px; font-weight: 600;
+  }
+</style>
+</head>
+<body>ChuQin</body>
+</html>"""
 
 
 def get_resource_path():
@@ -97,218 +137,150 @@ def start_dev_server(portal_dir):
     return dev_url
 
 
-def get_gitconfig_path():
+def log_startup_timing(stage):
     """
-    Get the path to the user's .gitconfig file.
+    Report the time elapsed since the process started, the first time a stage is reached.
+    Returns None for stages already reported. Printed only with CHUQIN_STARTUP_TIMING=1.
     """
-    home = Path.home()
-    gitconfig_path = home / ".gitconfig"
-    return str(gitconfig_path)
+    elapsed_ms = (time.perf_counter() - STARTUP_TIME) * 1000
+    with _reported_stages_lock:
+        if stage in _reported_stages:
+            return None
+        _reported_stages.add(stage)
+    if CHUQIN_STARTUP_TIMING:
+        print(f"[startup] {stage} after {elapsed_ms:.0f} ms")
+    return elapsed_ms
 
 
-def read_gitconfig():
+def load_portal(window):
     """
-    Read and parse the .gitconfig file.
-    Returns a list of config entries with their structure.
+    Resolve the portal URL and navigate the already visible shell window to it.
+    Runs in a background thread started by webview.start.
     """
-    gitconfig_path = get_gitconfig_path()
-    
-    if not os.path.exists(gitconfig_path):
-        return {
-            "success": True,
-            "entries": [],
-            "raw_content": ""
-        }
-    
+    global _portal_url
     try:
-        with open(gitconfig_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        entries = []
-        lines = content.split('\n')
-        current_section = None
-        current_subsection = None
-        
-        for i, line in enumerate(lines):
-            stripped = line.strip()
-            
-            # Skip empty lines
-            if not stripped:
-                entries.append({
-                    "type": "empty",
-                    "line_number": i + 1,
-                    "raw": line
-                })
-                continue
-            
-            # Check if line is commented (disabled) - but preserve original for pure comments
-            is_disabled = stripped.startswith('#')
-            original_stripped = stripped
-            
-            # Pure comment line (starts with # and is not a disabled config)
-            if is_disabled and not re.match(r'#\s*\[', stripped) and not re.match(r'#\s*\S+\s*=', stripped):
-                entries.append({
-                    "type": "comment",
-                    "line_number": i + 1,
-                    "raw": line
-                })
-                continue
-            
-            # Remove # prefix for disabled configs
-            if is_disabled:
-                stripped = stripped[1:].strip()
-            
-            # Section header: [section "subsection"] or [section]
-            section_match = re.match(r'\[([^\]]+)\]', stripped)
-            if section_match:
-                section_str = section_match.group(1)
-                parts = section_str.split('"', 1)
-                if len(parts) == 2:
-                    current_section = parts[0].strip()
-                    current_subsection = parts[1].rstrip('"').strip()
-                else:
-                    current_section = section_str.strip()
-                    current_subsection = None
-                
-                entries.append({
-                    "type": "section",
-                    "line_number": i + 1,
-                    "section": current_section,
-                    "subsection": current_subsection,
-                    "disabled": is_disabled,
-                    "raw": line
-                })
-                continue
-            
-            # Key-value pair: key = value
-            kv_match = re.match(r'(\S+)\s*=\s*(.*)$', stripped)
-            if kv_match:
-                key = kv_match.group(1).strip()
-                value = kv_match.group(2).strip()
-                
-                entries.append({
-                    "type": "config",
-                    "line_number": i + 1,
-                    "section": current_section,
-                    "subsection": current_subsection,
-                    "key": key,
-                    "value": value,
-                    "disabled": is_disabled,
-                    "raw": line
-                })
-                continue
-            
-            # Unknown line type - preserve as-is
-            entries.append({
-                "type": "unknown",
-                "line_number": i + 1,
-                "raw": line
-            })
-        
-        return {
-            "success": True,
-            "entries": entries,
-            "raw_content": content
-        }
+        url = get_portal_url()
     except Exception as e:
-        return {
-            "success": False,
-            "error": str(e),
-            "entries": [],
-            "raw_content": ""
-        }
+        # Includes OSError when pnpm or npm is missing, the window would stay on the splash
+        window.load_html(f"<p style='font-family: sans-serif; padding: 40px'>{escape(str(e))}</p>")
+        return
+    _portal_url = url
+    window.load_url(url)
 
 
-def write_gitconfig(entries):
+def _scope_error(scope):
+    if scope not in GITCONFIG_SCOPES:
+        return {"success": False, "error": f"Unknown config scope: {scope}"}
+    return None
+
+
+class Api:
     """
-    Write config entries back to .gitconfig file.
-    entries: List of entry objects with structure from read_gitconfig
+    API class to expose Python functions to JavaScript.
+    Each window has its own instance; shared state lives in the BackendService.
     """
-    gitconfig_path = get_gitconfig_path()
-    
-    try:
-        lines = []
-        for entry in entries:
-            if entry.get("type") == "empty":
-                lines.append("")
-            elif entry.get("type") == "section":
-                section = entry.get("section", "")
-                subsection = entry.get("subsection")
-                disabled = entry.get("disabled", False)
-                
-                if subsection:
-                    section_str = f'[{section} "{subsection}"]'
-                else:
-                    section_str = f'[{section}]'
-                
-                if disabled:
-                    lines.append(f"# {section_str}")
-                else:
-                    lines.append(section_str)
-            elif entry.get("type") == "config":
-                key = entry.get("key", "")
-                value = entry.get("value", "")
-                disabled = entry.get("disabled", False)
-                
-                # Add space indentation before config key-value pairs (4 spaces)
-                indent = "    "  # 4 spaces
-                if disabled:
-                    # For disabled configs, add spaces before the comment
-                    config_line = f"{indent}# {key} = {value}"
-                else:
-                    config_line = f"{indent}{key} = {value}"
-                lines.append(config_line)
-            elif entry.get("type") == "comment":
-                lines.append(entry.get("raw", ""))
-            elif entry.get("type") == "unknown":
-                lines.append(entry.get("raw", ""))
-            else:
-                # Fallback: use raw content
-                lines.append(entry.get("raw", ""))
-        
-        content = '\n'.join(lines)
-        
-        # Ensure directory exists
-        os.makedirs(os.path.dirname(gitconfig_path), exist_ok=True)
-        
-        with open(gitconfig_path, 'w', encoding='utf-8') as f:
-            f.write(content)
-        
-        return {"success": True}
-    except Exception as e:
-        return {"success": False, "error": str(e)}
+    def __init__(self, service, window_id, view=None):
+        self._service = service
+        self._window_id = window_id
+        self._view = view
+        # The validated entries are kept per window, so windows editing different
+        # files or scopes neither replace each other's entries nor wait on each other
+        self._linter = GitConfigLinter()
 
+    def get_window_info(self):
+        return {"window_id": self._window_id, "view": self._view}
 
-class Api:
-    """API class to expose Python functions to JavaScript"""
-    def read_gitconfig(self):
-        return read_gitconfig()
+    def open_window(self, view=None):
+        if _portal_url is None:
+            return {"success": False, "error": "Portal is still loading"}
+        create_window(self._service, view, url=_portal_url)
+        return {"success": True}
+
+    def read_gitconfig(self, scope="global"):
+        error = _scope_error(scope)
+        if error:
+            return error
+        return self._service.read_gitconfig(get_gitconfig_path(scope))
     
-    def write_gitconfig(self, entries):
-        return write_gitconfig(entries)
+    def write_gitconfig(self, entries, scope="global"):
+        error = _scope_error(scope)
+        if error:
+            return error
+        return self._service.write_gitconfig(entries, get_gitconfig_path(scope), source=self._window_id)
     
-    def get_gitconfig_path(self):
-        return get_gitconfig_path()
+    def get_gitconfig_path(self, scope="global"):
+        return _scope_error(scope) or get_gitconfig_path(scope)
 
+    def validate_gitconfig(self, entries):
+        return validate_gitconfig(entries, self._linter)
 
-def main():
-    url = get_portal_url()
+    def revalidate_gitconfig(self, start, delete_count, entries):
+        return revalidate_gitconfig(self._linter, start, delete_count, entries)
+
+    def parse_gitconfig(self, content):
+        return {"success": True, "entries": parse_gitconfig(content)}
+
+    def diff_gitconfig(self, other_path, scope="global", entries=None):
+        error = _scope_error(scope)
+        if error:
+            return error
+        return self._service.diff_gitconfig(get_gitconfig_path(scope), other_path, entries)
+
+    def merge_gitconfig(self, base_path, their_path, scope="global", entries=None):
+        error = _scope_error(scope)
+        if error:
+            return error
+        return self._service.merge_gitconfig(base_path, get_gitconfig_path(scope), their_path, entries)
+
+    def analyze_url_log(self, path, top=20):
+        return analyze_url_log(path, top)
+
+    def get_url_log_stats(self, analysis_id, category, offset=0, limit=50):
+        return get_url_log_stats(analysis_id, category, offset, limit)
+
+    def read_url_log_page(self, path, cursor=0, limit=100, mode="decode"):
+        return read_url_log_page(path, cursor, limit, mode)
+
+    def report_interactive(self):
+        return log_startup_timing("interactive")
+
+
+def create_window(service, view=None, url=None, html=None):
+    """
+    Create a window with its own Api object bound to the shared service.
+    view is the tool the window opens, None for the dashboard.
+    """
+    window_id = service.next_window_id()
 
     # Expose Python functions to JavaScript using a class
-    api = Api()
+    api = Api(service, window_id, view)
 
     window = webview.create_window(
         title='ChuQin',
         url=url,
+        html=html,
         width=1200,
         height=800,
         min_size=(600, 500),
         resizable=True,
         js_api=api
     )
+    service.register_window(window_id, window)
+    return window
+
+
+def main():
+    service = BackendService()
+
+    # Open the window with an inline splash right away, the portal is loaded afterwards
+    window = create_window(service, html=SPLASH_HTML)
+
+    window.events.shown += lambda: log_startup_timing("window visible")
 
-    webview.start(debug=False)
+    webview.start(load_portal, window, debug=False)
 
 
 if __name__ == "__main__":
+    # Required for the URL log process pool in PyInstaller bundles
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1,228 @@
+import itertools
+import json
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from app.gitconfig import get_gitconfig_path, parse_gitconfig, read_gitconfig, write_gitconfig
+from app.gitconfig_diff import diff_gitconfig, merge_gitconfig
+
+# Browser event dispatched in every window when a config file is saved
+GITCONFIG_CHANGED_EVENT = "chuqin:gitconfig-changed"
+# Number of parsed config files kept in memory, least recently read are dropped first
+MAX_CACHED_CONFIGS = 8
+
+
+def _real_path(path):
+    """Expand ~ and resolve symlinks, so every spelling of a file maps to one path."""
+    return os.path.realpath(os.path.expanduser(path))
+
+
+def _missing_file_error(*paths):
+    for path in paths:
+        if not os.path.isfile(path):
+            return {"success": False, "error": f"File not found: {path}"}
+    return None
+
+
+class ReadWriteLock:
+    """
+    Lock allowing many concurrent readers or a single writer.
+    Waiting writers block new readers so writes are not starved.
+    """
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    @contextmanager
+    def read(self):
+        with self._cond:
+            while self._writer or self._waiting_writers:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._cond:
+            self._waiting_writers += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._waiting_writers -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()
+
+
+class BackendService:
+    """
+    Backend state shared by all windows.
+    Every window gets its own Api object, but they all read and write config
+    files through this service, so reads run in parallel, writes are exclusive
+    and every window is told about changes.
+    """
+    def __init__(self):
+        # Both are keyed by real path, so every spelling of a file shares one lock.
+        # A lock is dropped once no thread holds it.
+        self._file_locks = weakref.WeakValueDictionary()
+        self._parse_cache = OrderedDict()
+        self._windows = {}
+        self._window_ids = itertools.count(1)
+        # Guards the dicts above, never held while doing I/O
+        self._mutex = threading.Lock()
+
+    def _file_lock(self, path):
+        """Lock of a file, path must be a real path."""
+        with self._mutex:
+            lock = self._file_locks.get(path)
+            if lock is None:
+                lock = self._file_locks[path] = ReadWriteLock()
+            return lock
+
+    def next_window_id(self):
+        return next(self._window_ids)
+
+    def register_window(self, window_id, window):
+        with self._mutex:
+            self._windows[window_id] = window
+        window.events.closed += lambda: self.unregister_window(window_id)
+
+    def unregister_window(self, window_id):
+        with self._mutex:
+            self._windows.pop(window_id, None)
+
+    def broadcast(self, event, detail):
+        """
+        Dispatch a DOM CustomEvent with the given detail in every open window.
+        """
+        script = f"window.dispatchEvent(new CustomEvent({json.dumps(event)}, {{ detail: {json.dumps(detail)} }}))"
+        with self._mutex:
+            windows = list(self._windows.values())
+        for window in windows:
+            try:
+                window.evaluate_js(script)
+            except Exception:
+                # The window is closing or its page is still loading, it reads the
+                # config again when it loads, so the notification is not needed
+                pass
+
+    def read_gitconfig(self, path=None):
+        """
+        Read a config file through the shared parse cache.
+        The cache is keyed by path and revalidated against the file's mtime and size.
+        """
+        result = self._read_cached(path or get_gitconfig_path())
+        # Entries are shared between callers, hand out copies so they stay intact
+        return dict(result, entries=[dict(entry) for entry in result["entries"]])
+
+    def _read_cached(self, path):
+        """
+        Return the cached parse result itself, callers must not modify its entries.
+        """
+        path = _real_path(path)
+        with self._file_lock(path).read():
+            try:
+                stat = os.stat(path)
+                version = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                version = None
+
+            with self._mutex:
+                cached = self._parse_cache.get(path)
+                if cached is not None:
+                    self._parse_cache.move_to_end(path)
+            if version is not None and cached is not None and cached[0] == version:
+                result = cached[1]
+            else:
+                result = read_gitconfig(path)
+                if version is not None and result["success"]:
+                    with self._mutex:
+                        self._parse_cache[path] = (version, result)
+                        while len(self._parse_cache) > MAX_CACHED_CONFIGS:
+                            self._parse_cache.popitem(last=False)
+        return result
+
+    def _read_contents(self, paths):
+        """
+        Read config files as text, each under its read lock.
+        Only the sections that differ get parsed, so the parse cache is not used here.
+        """
+        contents = {}
+        for path in paths:
+            with self._file_lock(path).read():
+                with open(path, "r", encoding="utf-8") as f:
+                    contents[path] = f.read()
+        return contents
+
+    def diff_gitconfig(self, left_path, right_path, left_entries=None):
+        """
+        Structural diff of two config files.
+        left_entries, when given, are compared instead of left_path's content, so
+        unsaved edits are included.
+        """
+        left_path = _real_path(left_path)
+        right_path = _real_path(right_path)
+        paths = (right_path,) if left_entries is not None else (left_path, right_path)
+        error = _missing_file_error(*paths)
+        if error:
+            return error
+        try:
+            contents = self._read_contents(paths)
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+        left = left_entries if left_entries is not None else contents[left_path]
+        return dict(diff_gitconfig(left, contents[right_path]), success=True)
+
+    def merge_gitconfig(self, base_path, our_path, their_path, our_entries=None, include_entries=False):
+        """
+        Three-way merge of config files, the merged file is returned and not written.
+        our_entries, when given, are merged instead of our_path's content, so unsaved
+        edits are kept. With include_entries, a merge without conflicts also carries
+        the parsed result.
+        """
+        base_path = _real_path(base_path)
+        our_path = _real_path(our_path)
+        their_path = _real_path(their_path)
+        paths = (base_path, their_path) if our_entries is not None else (base_path, our_path, their_path)
+        error = _missing_file_error(*paths)
+        if error:
+            return error
+        try:
+            contents = self._read_contents(paths)
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+        ours = our_entries if our_entries is not None else contents[our_path]
+        merged = merge_gitconfig(contents[base_path], ours, contents[their_path])
+        if include_entries and not merged["conflicts"]:
+            merged["entries"] = parse_gitconfig(merged["content"])
+        return dict(merged, success=True)
+
+    def write_gitconfig(self, entries, path=None, source=None):
+        """
+        Write a config file exclusively and notify every window.
+        source is the id of the window that saved, so it can ignore its own change.
+        """
+        path = path or get_gitconfig_path()
+        real_path = _real_path(path)
+        with self._file_lock(real_path).write():
+            result = write_gitconfig(entries, real_path)
+            with self._mutex:
+                self._parse_cache.pop(real_path, None)
+
+        if result["success"]:
+            self.broadcast(GITCONFIG_CHANGED_EVENT, {"path": path, "source": source})
+        return result
@@ -0,0 +1,302 @@
+import os
+import re
+import threading
+import uuid
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qsl, quote, unquote, urlsplit
+
+# Files larger than this are split into byte ranges and analyzed in a process pool
+PROCESS_POOL_THRESHOLD = 64 * 1024 * 1024
+# Size of each byte range handed to a worker process
+CHUNK_SIZE = 32 * 1024 * 1024
+# Upper bound of distinct keys kept per aggregate (hosts, paths, params)
+MAX_AGGREGATE_KEYS = 50000
+# Number of finished analyses kept in memory for paging
+MAX_CACHED_ANALYSES = 4
+# Characters left unescaped by JavaScript's encodeURIComponent
+ENCODE_SAFE_CHARS = "-_.!~*'()"
+
+AGGREGATE_CATEGORIES = ("hosts", "paths", "params")
+
+_REQUEST_LINE_RE = re.compile(
+    r'"?(?:GET|POST|PUT|DELETE|HEAD|OPTIONS|PATCH|CONNECT|TRACE) (\S+) HTTP/[\d.]+'
+)
+_ABSOLUTE_URL_RE = re.compile(r'[a-zA-Z][a-zA-Z0-9+.-]*://[^\s"\'<>]+')
+
+_analyses = OrderedDict()
+_analyses_lock = threading.Lock()
+
+
+class _BoundedCounter:
+    """
+    Counter that keeps at most max_keys distinct keys.
+    When the limit is exceeded the least frequent half is dropped, so counts
+    of rare keys are approximate but memory stays bounded on huge logs.
+    """
+    def __init__(self, max_keys=MAX_AGGREGATE_KEYS):
+        self.max_keys = max_keys
+        self.counts = Counter()
+        self.truncated = False
+
+    def add(self, key, count=1):
+        self.counts[key] += count
+        if len(self.counts) > self.max_keys:
+            self._prune()
+
+    def update(self, counts):
+        for key, count in counts.items():
+            self.counts[key] += count
+        if len(self.counts) > self.max_keys:
+            self._prune()
+
+    def _prune(self):
+        self.counts = Counter(dict(self.counts.most_common(self.max_keys // 2)))
+        self.truncated = True
+
+
+def extract_url(line):
+    """
+    Extract the URL from a single access log line.
+    Prefers the request target of an HTTP request line, then the first absolute URL,
+    and finally treats a line without whitespace as a bare URL.
+    """
+    match = _REQUEST_LINE_RE.search(line)
+    if match:
+        return match.group(1)
+    match = _ABSOLUTE_URL_RE.search(line)
+    if match:
+        return match.group(0)
+    stripped = line.strip()
+    if stripped and not any(c.isspace() for c in stripped):
+        return stripped
+    return None
+
+
+def parse_url(url):
+    """
+    Split a URL into its components and decoded query parameters.
+    """
+    parts = urlsplit(url)
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    return {
+        "scheme": parts.scheme,
+        "host": parts.hostname or "",
+        "port": port,
+        "path": unquote(parts.path),
+        "query": parts.query,
+        "fragment": unquote(parts.fragment),
+        "params": parse_qsl(parts.query, keep_blank_values=True),
+    }
+
+
+def transform_url(url, mode):
+    """
+    Encode or decode a URL the same way the URL tool does in the browser.
+    """
+    if mode == "encode":
+        return quote(url, safe=ENCODE_SAFE_CHARS)
+    return unquote(url)
+
+
+def _new_aggregates():
+    return {category: _BoundedCounter() for category in AGGREGATE_CATEGORIES}
+
+
+def _aggregate_line(line, aggregates):
+    url = extract_url(line)
+    if url is None:
+        return False
+    try:
+        parsed = parse_url(url)
+    except ValueError:
+        return False
+    if parsed["host"]:
+        aggregates["hosts"].add(parsed["host"])
+    aggregates["paths"].add(parsed["path"] or "/")
+    for name, _ in parsed["params"]:
+        aggregates["params"].add(name)
+    return True
+
+
+def _analyze_range(path, start, end):
+    """
+    Aggregate URLs of all lines starting inside the byte range [start, end).
+    Runs in a worker process, so it only returns plain picklable data.
+    """
+    aggregates = _new_aggregates()
+    lines = 0
+    urls = 0
+    with open(path, 'rb') as f:
+        if start > 0:
+            # Skip the partial line, it belongs to the previous range
+            f.seek(start - 1)
+            f.readline()
+        while f.tell() < end:
+            raw = f.readline()
+            if not raw:
+                break
+            lines += 1
+            if _aggregate_line(raw.decode('utf-8', errors='replace'), aggregates):
+                urls += 1
+    return {
+        "lines": lines,
+        "urls": urls,
+        "aggregates": {name: dict(counter.counts) for name, counter in aggregates.items()},
+        "truncated": any(counter.truncated for counter in aggregates.values()),
+    }
+
+
+def _split_ranges(size):
+    ranges = []
+    start = 0
+    while start < size:
+        end = min(start + CHUNK_SIZE, size)
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+
+def _store_analysis(result):
+    analysis_id = uuid.uuid4().hex
+    with _analyses_lock:
+        _analyses[analysis_id] = result
+        while len(_analyses) > MAX_CACHED_ANALYSES:
+            _analyses.popitem(last=False)
+    return analysis_id
+
+
+def analyze_url_log(path, top=20):
+    """
+    Stream an access log and count URLs per host, path and query parameter.
+    Files over PROCESS_POOL_THRESHOLD are analyzed in parallel by a process pool.
+    Returns a summary with the top entries; use get_url_log_stats to page the rest.
+    """
+    path = os.path.expanduser(path)
+    try:
+        size = os.path.getsize(path)
+        aggregates = _new_aggregates()
+        lines = 0
+        urls = 0
+        truncated = False
+
+        if size > PROCESS_POOL_THRESHOLD:
+            ranges = _split_ranges(size)
+            with ProcessPoolExecutor() as executor:
+                partials = executor.map(
+                    _analyze_range,
+                    [path] * len(ranges),
+                    [start for start, _ in ranges],
+                    [end for _, end in ranges],
+                )
+                for partial in partials:
+                    lines += partial["lines"]
+                    urls += partial["urls"]
+                    truncated = truncated or partial["truncated"]
+                    for name, counts in partial["aggregates"].items():
+                        aggregates[name].update(counts)
+        else:
+            partial = _analyze_range(path, 0, size)
+            lines = partial["lines"]
+            urls = partial["urls"]
+            truncated = partial["truncated"]
+            for name, counts in partial["aggregates"].items():
+                aggregates[name].update(counts)
+
+        truncated = truncated or any(counter.truncated for counter in aggregates.values())
+        stats = {
+            name: [{"name": key, "count": count} for key, count in counter.counts.most_common()]
+            for name, counter in aggregates.items()
+        }
+        analysis_id = _store_analysis({"path": path, "stats": stats})
+
+        return {
+            "success": True,
+            "analysis_id": analysis_id,
+            "path": path,
+            "size": size,
+            "lines": lines,
+            "urls": urls,
+            "truncated": truncated,
+            "totals": {name: len(items) for name, items in stats.items()},
+            "top": {name: items[:top] for name, items in stats.items()},
+        }
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+def get_url_log_stats(analysis_id, category, offset=0, limit=50):
+    """
+    Return one page of an aggregate (hosts, paths or params) from a finished analysis.
+    """
+    if category not in AGGREGATE_CATEGORIES:
+        return {"success": False, "error": f"Unknown category: {category}"}
+    if offset < 0 or limit < 1:
+        return {"success": False, "error": f"Invalid page: offset {offset}, limit {limit}"}
+
+    with _analyses_lock:
+        analysis = _analyses.get(analysis_id)
+    if analysis is None:
+        return {"success": False, "error": "Analysis expired, please analyze the file again"}
+
+    items = analysis["stats"][category]
+    return {
+        "success": True,
+        "category": category,
+        "offset": offset,
+        "total": len(items),
+        "items": items[offset:offset + limit],
+    }
+
+
+def read_url_log_page(path, cursor=0, limit=100, mode="decode"):
+    """
+    Read the next page of URLs from a log, starting at byte offset cursor.
+    Every URL is encoded or decoded and split into components.
+    Returns next_cursor so the UI can continue without keeping the file in memory.
+    """
+    if mode not in ("encode", "decode"):
+        return {"success": False, "error": f"Unknown mode: {mode}"}
+    if cursor < 0 or limit < 1:
+        return {"success": False, "error": f"Invalid page: cursor {cursor}, limit {limit}"}
+
+    path = os.path.expanduser(path)
+    try:
+        items = []
+        # Bound the scan so logs with few URLs cannot stall a single page
+        max_scan_lines = limit * 100
+        scanned = 0
+        with open(path, 'rb') as f:
+            f.seek(cursor)
+            while len(items) < limit and scanned < max_scan_lines:
+                offset = f.tell()
+                raw = f.readline()
+                if not raw:
+                    break
+                scanned += 1
+                url = extract_url(raw.decode('utf-8', errors='replace'))
+                if url is None:
+                    continue
+                try:
+                    item = parse_url(url)
+                except ValueError:
+                    continue
+                item["offset"] = offset
+                item["original"] = url
+                item["result"] = transform_url(url, mode)
+                items.append(item)
+            next_cursor = f.tell()
+            eof = not f.read(1)
+
+        return {
+            "success": True,
+            "items": items,
+            "cursor": cursor,
+            "next_cursor": next_cursor,
+            "eof": eof,
+        }
+    except Exception as e:
+        return {"success": False, "error": str(e)}
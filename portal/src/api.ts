@@ -0,0 +1,26 @@
+const API_TIMEOUT = 5000
+
+let apiPromise: Promise<any> | null = null
+
+// Resolves with the pywebview API as soon as the bridge is up.
+// pywebview dispatches `pywebviewready` once the Python API is injected, so no polling is needed.
+export const getApi = (): Promise<any> => {
+  if (!apiPromise) {
+    apiPromise = new Promise((resolve, reject) => {
+      const api = (window as any).pywebview?.api
+      if (api) {
+        resolve(api)
+        return
+      }
+      const timer = setTimeout(() => {
+        apiPromise = null
+        reject(new Error('Python API not available after waiting. Please ensure the application is running in pywebview.'))
+      }, API_TIMEOUT)
+      window.addEventListener('pywebviewready', () => {
+        clearTimeout(timer)
+        resolve((window as any).pywebview.api)
+      }, { once: true })
+    })
+  }
+  return apiPromise
+}
@@ -2,7 +2,12 @@ import { createApp } from 'vue'
 import TinyVue from '@opentiny/vue'
 import '@opentiny/vue-theme/index.css'
 import App from './App.vue'
+import { getApi } from './api'
 
 const app = createApp(App)
 app.use(TinyVue)
 app.mount('#app')
+
+getApi()
+  .then((api) => api.report_interactive?.())
+  .catch((error) => console.error('Failed to connect to Python API:', error))
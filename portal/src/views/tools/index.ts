@@ -0,0 +1,16 @@
+// Each tool view is built into its own chunk and only loaded when first opened
+export const toolLoaders: Record<string, () => Promise<any>> = {
+  md5: () => import('./MD5Tool.vue'),
+  url: () => import('./URLTool.vue'),
+  hex: () => import('./HEXTool.vue'),
+  timestamp: () => import('./TimestampTool.vue'),
+  'git-config': () => import('./GitConfigTool.vue')
+}
+
+// Start downloading a tool chunk ahead of navigation, e.g. when its card is hovered
+export const prefetchTool = (id: string) => {
+  const loader = toolLoaders[id]
+  if (loader) {
+    loader().catch((error) => console.error('Failed to prefetch tool:', id, error))
+  }
+}
@@ -0,0 +1,98 @@
+from app.gitconfig import parse_gitconfig, write_gitconfig
+from app.gitconfig_diff import diff_gitconfig, merge_gitconfig
+
+BASE = """# Personal settings
+[user]
+    name = Alice
+    email = alice@example.com
+
+[core]
+    editor = vim
+    # pager = less
+    autocrlf = input
+"""
+
+
+def merge(base, ours, theirs):
+    return merge_gitconfig(parse_gitconfig(base), parse_gitconfig(ours), parse_gitconfig(theirs))
+
+
+def test_merge_keeps_comments_and_disabled_keys():
+    ours = BASE.replace("editor = vim", "editor = nvim")
+    theirs = BASE.replace("autocrlf = input", "autocrlf = false") + "    filemode = false\n"
+
+    result = merge(BASE, ours, theirs)
+
+    assert result["conflicts"] == []
+    assert result["content"] == """# Personal settings
+[user]
+    name = Alice
+    email = alice@example.com
+
+[core]
+    editor = nvim
+    # pager = less
+    autocrlf = false
+    filemode = false
+"""
+
+
+def test_merge_keeps_keys_under_disabled_header():
+    base = "[core]\n    editor = vim\n# [user]\n    # name = Bob\n    filemode = true\n"
+    ours = base.replace("editor = vim", "editor = nano")
+    theirs = base.replace("filemode = true", "filemode = false")
+
+    result = merge(base, ours, theirs)
+
+    assert result["conflicts"] == []
+    assert result["content"] == "[core]\n    editor = nano\n# [user]\n    # name = Bob\n    filemode = false\n"
+
+
+def test_merge_conflict_markers():
+    ours = BASE.replace("editor = vim", "editor = nvim")
+    theirs = BASE.replace("editor = vim", "editor = emacs")
+
+    result = merge(BASE, ours, theirs)
+
+    assert [conflict["key"] for conflict in result["conflicts"]] == ["editor"]
+    lines = result["content"].split("\n")
+    line = result["conflicts"][0]["line"]
+    assert lines[line - 1:line + 4] == [
+        "<<<<<<< ours", "    editor = nvim", "=======", "    editor = emacs", ">>>>>>> theirs",
+    ]
+
+
+def test_merge_and_save_does_not_grow_file(tmp_path):
+    path = tmp_path / "config"
+    ours = BASE.replace("editor = vim", "editor = nvim")
+    theirs = BASE.replace("autocrlf = input", "autocrlf = false")
+
+    for _ in range(3):
+        content = merge(BASE, ours, theirs)["content"]
+        assert write_gitconfig(parse_gitconfig(content), str(path))["success"]
+        ours = path.read_text(encoding="utf-8")
+
+    assert ours == content
+    assert ours.endswith("autocrlf = false\n")
+
+
+def test_diff_ignores_comment_only_changes():
+    other = BASE.replace("# pager = less", "# pager = more").replace("# Personal", "# Shared")
+
+    result = diff_gitconfig(parse_gitconfig(BASE), parse_gitconfig(other))
+
+    assert result["sections"] == []
+    assert result["summary"]["identical_sections"] == 3
+
+
+def test_content_and_entries_give_the_same_result():
+    ours = (
+        "key = before header\n  [core]\n    editor = nvim\n# [user]\n    name = x\n"
+        "[remote \"origin\"]\n    fetch = a\n[core]\n    bare = false\n    editor = ed\n"
+    )
+    theirs = BASE.replace("name = Alice", "name = Bob") + "[remote \"origin\"]\n    fetch = b\n"
+
+    for base, left, right in ((BASE, ours, theirs), (theirs, BASE, ours), (ours, theirs, BASE)):
+        assert diff_gitconfig(left, right) == diff_gitconfig(parse_gitconfig(left), parse_gitconfig(right))
+        assert merge_gitconfig(base, left, right) == merge(base, left, right)
+        assert merge_gitconfig(base, parse_gitconfig(left), right) == merge(base, left, right)
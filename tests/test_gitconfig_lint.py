@@ -0,0 +1,124 @@
+import random
+
+import pytest
+
+from app.gitconfig import parse_gitconfig
+from app.gitconfig_lint import GitConfigLinter, revalidate_gitconfig, validate_gitconfig
+
+
+def rules(content):
+    return [(d["line_number"], d["rule"]) for d in validate_gitconfig(parse_gitconfig(content))["diagnostics"]]
+
+
+def apply_revalidation(diagnostics, result, start, delete_count, insert_count):
+    """Merge a splice result into earlier diagnostics, as the GitConfig tool does."""
+    end = start + delete_count
+    delta = insert_count - delete_count
+
+    def shift(line):
+        return line + delta if line is not None and line > end else line
+
+    kept = [
+        dict(d, line_number=shift(d["line_number"]), related_line_number=shift(d["related_line_number"]))
+        for d in diagnostics if d["section"] not in result["sections"]
+    ]
+    return sorted(kept + result["diagnostics"], key=lambda d: d["line_number"])
+
+
+def test_duplicate_and_shadowed_keys():
+    content = "[user]\n    name = a\n    name = a\n[core]\n    editor = vim\n    editor = nano\n"
+    assert rules(content) == [(3, "duplicate-key"), (5, "shadowed-key")]
+
+
+def test_bad_boolean():
+    assert rules("[core]\n    filemode = maybe\n    bare = yes\n") == [(2, "bad-boolean")]
+
+
+def test_bare_key_is_only_valid_inside_a_section():
+    assert rules("[core]\n    bare\n") == []
+    assert rules("bare\n[core]\n") == [(1, "unparseable-line")]
+
+
+def test_disabled_header_does_not_start_a_section():
+    content = "[core]\n    editor = vim\n# [user]\n    editor = nano\n    filemode = maybe\n"
+    assert rules(content) == [(2, "shadowed-key"), (5, "bad-boolean")]
+
+
+def test_multi_valued_keys_and_known_sections():
+    content = (
+        "[maintenance]\n    repo = /src/a\n    repo = /src/b\n"
+        '[http "https://example.com"]\n    extraHeader = A: 1\n    extraHeader = B: 2\n'
+        "[pretty]\n    short = format:%h %s\n"
+        "[mailmap]\n    file = ~/.mailmap\n"
+    )
+    assert rules(content) == []
+    assert rules("[colour]\n    ui = auto\n") == [(1, "unknown-section")]
+
+
+EDITS = [
+    # Key before the first header
+    (0, 0, ["# note", "    editor = vim"]),
+    # Insert a header that splits a section, then delete it again
+    (4, 0, ["[user]"]),
+    (4, 1, []),
+    # Disable and enable a header in place
+    (6, 1, ["# [user]"]),
+    (6, 1, ["[user]"]),
+    # Replace a key
+    (3, 1, ["    filemode = maybe"]),
+    # Delete the first header, its keys move before any header
+    (2, 1, []),
+    # Append at the end, then delete everything
+    (13, 0, ["[core]", "    editor = emacs"]),
+    (0, 15, []),
+    (0, 0, ["    name = x", "[user]", "    name = y", "    name = z"]),
+]
+
+
+def test_splice_matches_full_lint():
+    content = (
+        "[core]\n    editor = vim\n    bare = true\n    editor = nano\n"
+        "[user]\n    name = a\n[core]\n    filemode = no\n    editor = ed\n[user]\n    name = b\n"
+    )
+    entries = parse_gitconfig(content)
+    linter = GitConfigLinter()
+    diagnostics = validate_gitconfig(entries, linter)["diagnostics"]
+
+    for start, delete_count, lines in EDITS:
+        items = parse_gitconfig("\n".join(lines))[:len(lines)]
+        result = revalidate_gitconfig(linter, start, delete_count, items)
+        entries[start:start + delete_count] = items
+
+        expected = validate_gitconfig(entries)
+        diagnostics = apply_revalidation(diagnostics, result, start, delete_count, len(items))
+        assert diagnostics == expected["diagnostics"]
+        assert (result["errors"], result["warnings"]) == (expected["errors"], expected["warnings"])
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random_splices_match_full_lint(seed):
+    pool = parse_gitconfig(
+        "[core]\n    editor = vim\n    filemode = maybe\n# [user]\n[user]\n    name = a\n    name = b\n"
+        "bad line\n[Bad_sec]\n    1key = x\n# key = y\n[remote \"o\"]\n    url = x\n[core]\n    bare\n"
+    )
+    rnd = random.Random(seed)
+    entries = [dict(rnd.choice(pool)) for _ in range(rnd.randint(0, 15))]
+    linter = GitConfigLinter()
+    diagnostics = validate_gitconfig(entries, linter)["diagnostics"]
+
+    for _ in range(30):
+        start = rnd.randint(0, len(entries))
+        delete_count = rnd.randint(0, min(3, len(entries) - start))
+        items = [dict(rnd.choice(pool)) for _ in range(rnd.randint(0, 3))]
+        result = revalidate_gitconfig(linter, start, delete_count, items)
+        entries[start:start + delete_count] = items
+
+        diagnostics = apply_revalidation(diagnostics, result, start, delete_count, len(items))
+        assert diagnostics == validate_gitconfig(entries)["diagnostics"]
+
+
+def test_splice_requires_validation_and_valid_range():
+    linter = GitConfigLinter()
+    assert not revalidate_gitconfig(linter, 0, 0, [])["success"]
+    validate_gitconfig(parse_gitconfig("[core]\n"), linter)
+    assert not revalidate_gitconfig(linter, 1, 5, [])["success"]
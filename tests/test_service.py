@@ -0,0 +1,60 @@
+import os
+
+from app.service import MAX_CACHED_CONFIGS, BackendService
+
+
+def write(path, content="[core]\n    bare = false\n"):
+    path.write_text(content, encoding="utf-8")
+    return str(path)
+
+
+def test_spellings_of_one_file_share_lock_and_cache(tmp_path):
+    service = BackendService()
+    path = write(tmp_path / "config")
+    os.symlink(path, tmp_path / "link")
+
+    service.read_gitconfig(path)
+    service.read_gitconfig(str(tmp_path / "link"))
+    service.read_gitconfig(str(tmp_path / "." / "config"))
+
+    assert list(service._parse_cache) == [os.path.realpath(path)]
+    with service._file_lock(os.path.realpath(path)).read():
+        assert len(service._file_locks) == 1
+
+
+def test_write_through_symlink_invalidates_cache(tmp_path):
+    service = BackendService()
+    path = write(tmp_path / "config")
+    link = tmp_path / "link"
+    os.symlink(path, link)
+    entries = service.read_gitconfig(path)["entries"]
+
+    entries[1] = dict(entries[1], value="true")
+    assert service.write_gitconfig(entries, str(link))["success"]
+
+    assert link.is_symlink()
+    assert service.read_gitconfig(path)["entries"][1]["value"] == "true"
+
+
+def test_parse_cache_is_bounded(tmp_path):
+    service = BackendService()
+    for i in range(MAX_CACHED_CONFIGS + 4):
+        service.read_gitconfig(write(tmp_path / f"config{i}"))
+
+    assert len(service._parse_cache) == MAX_CACHED_CONFIGS
+    assert len(service._file_locks) == 0
+
+
+def test_diff_and_merge_expand_home(tmp_path, monkeypatch):
+    service = BackendService()
+    monkeypatch.setenv("HOME", str(tmp_path))
+    write(tmp_path / "base")
+    write(tmp_path / "theirs", "[core]\n    bare = true\n")
+
+    diff = service.diff_gitconfig("~/base", "~/theirs")
+    merged = service.merge_gitconfig("~/base", "~/base", "~/./theirs", include_entries=True)
+
+    assert diff["success"] and diff["summary"]["changed"] == 1
+    assert merged["content"] == "[core]\n    bare = true\n"
+    assert merged["entries"][1]["value"] == "true"
+    assert "entries" not in service.merge_gitconfig("~/base", "~/base", "~/theirs")
@@ -0,0 +1,98 @@
+import pytest
+
+from app import urllog
+from app.urllog import (
+    _analyze_range,
+    _split_ranges,
+    analyze_url_log,
+    extract_url,
+    get_url_log_stats,
+    read_url_log_page,
+    transform_url,
+)
+
+LOG_LINES = [
+    '127.0.0.1 - - [10/Oct/2024:13:55:36 +0000] "GET /search?q=a%20b&page=2 HTTP/1.1" 200 512',
+    '127.0.0.1 - - [10/Oct/2024:13:55:37 +0000] "POST /api/users HTTP/2.0" 201 64',
+    'redirect to https://example.com/docs/%E4%B8%AD?lang=zh for client',
+    'not a url line',
+    '',
+    'https://cdn.example.com/app.js?v=3',
+    '中文 "GET /路径?名=值 HTTP/1.1" 200 1',
+]
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    path = tmp_path / "access.log"
+    path.write_text("\n".join(LOG_LINES * 7) + "\n", encoding="utf-8")
+    return path
+
+
+def test_extract_url():
+    assert extract_url(LOG_LINES[0]) == "/search?q=a%20b&page=2"
+    assert extract_url(LOG_LINES[2]) == "https://example.com/docs/%E4%B8%AD?lang=zh"
+    assert extract_url("  /bare/path?x=1\n") == "/bare/path?x=1"
+    assert extract_url("not a url line") is None
+    assert extract_url("") is None
+
+
+def test_transform_url_matches_encode_uri_component():
+    assert transform_url("a b/c?d=é&e=(1)", "encode") == "a%20b%2Fc%3Fd%3D%C3%A9%26e%3D(1)"
+    assert transform_url("a%20b%2Fc%3Fd%3D%C3%A9", "decode") == "a b/c?d=é"
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 333, 4096])
+def test_ranges_match_single_pass(log_file, monkeypatch, chunk_size):
+    monkeypatch.setattr(urllog, "CHUNK_SIZE", chunk_size)
+    size = log_file.stat().st_size
+    whole = _analyze_range(str(log_file), 0, size)
+
+    partials = [_analyze_range(str(log_file), start, end) for start, end in _split_ranges(size)]
+
+    assert sum(partial["lines"] for partial in partials) == whole["lines"] == len(LOG_LINES) * 7
+    assert sum(partial["urls"] for partial in partials) == whole["urls"]
+    for name, counts in whole["aggregates"].items():
+        merged = {}
+        for partial in partials:
+            for key, count in partial["aggregates"][name].items():
+                merged[key] = merged.get(key, 0) + count
+        assert merged == counts
+
+
+def test_process_pool_matches_single_pass(log_file, monkeypatch):
+    single = analyze_url_log(str(log_file))
+    monkeypatch.setattr(urllog, "PROCESS_POOL_THRESHOLD", 0)
+    monkeypatch.setattr(urllog, "CHUNK_SIZE", 100)
+
+    pooled = analyze_url_log(str(log_file))
+
+    assert pooled["success"] and single["success"]
+    for field in ("lines", "urls", "totals", "top"):
+        assert pooled[field] == single[field]
+
+
+def test_paths_expand_home(log_file, monkeypatch):
+    monkeypatch.setenv("HOME", str(log_file.parent))
+
+    assert analyze_url_log("~/access.log")["success"]
+    assert read_url_log_page("~/access.log")["success"]
+
+
+def test_stats_paging_rejects_negative_values(log_file):
+    analysis_id = analyze_url_log(str(log_file))["analysis_id"]
+
+    page = get_url_log_stats(analysis_id, "paths", offset=1, limit=2)
+    assert page["success"] and len(page["items"]) == 2
+    assert not get_url_log_stats(analysis_id, "paths", offset=-1)["success"]
+    assert not get_url_log_stats(analysis_id, "paths", limit=-5)["success"]
+    assert not read_url_log_page(str(log_file), cursor=-1)["success"]
+
+
+def test_read_page_cursor_continues(log_file):
+    first = read_url_log_page(str(log_file), limit=3)
+    second = read_url_log_page(str(log_file), cursor=first["next_cursor"], limit=3)
+
+    assert [item["original"] for item in first["items"] + second["items"]] == [
+        extract_url(line) for line in LOG_LINES * 2 if extract_url(line)
+    ][:6]